@@ -0,0 +1,92 @@
+import numpy as np
+from typing import Tuple
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional; fall back to the vectorized NumPy path
+    njit = None
+
+
+NUMBA_AVAILABLE = njit is not None
+
+
+def _safe_sequence(alloc: np.ndarray, req: np.ndarray, avail: np.ndarray) -> Tuple[bool, np.ndarray]:
+    """
+    Banker's safety check on dense matrices.
+    alloc[p, r] and req[p, r] hold the instances of resource r allocated to and
+    requested by process p, avail[r] the free instances of r.
+    Returns whether the state is safe and the process indices in completion order
+    (only the processes that could finish when the state is unsafe).
+    """
+    n_proc, n_res = req.shape
+    work = avail.copy()
+    finished = np.zeros(n_proc, np.bool_)
+    sequence = np.empty(n_proc, np.int64)
+    count = 0
+
+    while count < n_proc:
+        found_process = False
+
+        for p in range(n_proc):
+            if finished[p]:
+                continue
+
+            # Check if this process can finish with available resources
+            can_finish = True
+            for r in range(n_res):
+                if work[r] < req[p, r]:
+                    can_finish = False
+                    break
+
+            if can_finish:
+                # Process can finish, release its resources
+                for r in range(n_res):
+                    work[r] += alloc[p, r]
+                finished[p] = True
+                sequence[count] = p
+                count += 1
+                found_process = True
+                break
+
+        if not found_process:
+            return False, sequence[:count]
+
+    return True, sequence
+
+
+def _safe_sequence_vectorized(alloc: np.ndarray, req: np.ndarray, avail: np.ndarray) -> Tuple[bool, np.ndarray]:
+    """
+    Same check as _safe_sequence, scanning for a runnable process with one
+    vectorized comparison per step instead of a P x R Python loop
+    """
+    n_proc = req.shape[0]
+    work = avail.copy()
+    finished = np.zeros(n_proc, np.bool_)
+    sequence = np.empty(n_proc, np.int64)
+    count = 0
+
+    while count < n_proc:
+        runnable = (req <= work).all(axis=1) & ~finished
+        if not runnable.any():
+            return False, sequence[:count]
+
+        # Lowest-index runnable process, as in the scalar loop
+        p = int(np.argmax(runnable))
+        work += alloc[p]
+        finished[p] = True
+        sequence[count] = p
+        count += 1
+
+    return True, sequence
+
+
+safe_sequence = njit(cache=True)(_safe_sequence) if NUMBA_AVAILABLE else _safe_sequence_vectorized
+
+
+def warm_up():
+    """
+    Run the kernel once on a tiny state so Numba compiles it (or loads it from
+    its cache) at startup rather than on the first request
+    """
+    empty = np.zeros((1, 1), np.int64)
+    safe_sequence(empty, empty, np.zeros(1, np.int64))
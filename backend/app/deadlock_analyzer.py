@@ -1,10 +1,37 @@
-import networkx as nx
+import hashlib
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
+from collections import defaultdict
+from functools import cached_property, lru_cache
 from typing import List, Dict, Set, Optional, Tuple
 from datetime import datetime
 from .graph_models import (
     GraphState, Node, Edge, EdgeType, NodeType,
     CycleInfo, DeadlockAnalysisResult, SafeSequenceResult
 )
+from .banker_kernel import safe_sequence as banker_safe_sequence
+
+
+# Integer codes for the edge type column
+_ALLOCATION = 0
+_REQUEST = 1
+_EDGE_TYPES = (EdgeType.ALLOCATION.value, EdgeType.REQUEST.value)
+_EDGE_TYPE_CODES = {edge_type: code for code, edge_type in enumerate(_EDGE_TYPES)}
+# Edges that do not run between a declared process and resource as their type requires
+_MALFORMED = 2
+
+# Below this many process x resource cells the dict-based Banker's check beats
+# building the dense matrices and calling the kernel
+_SCALAR_BANKER_MAX_CELLS = 64
+
+# Shared results for the common empty cases; callers must not mutate them
+_NO_CYCLE = CycleInfo.model_construct(exists=False, cycle_path=[], affected_nodes=[], affected_edges=[])
+_NO_PROCESSES = SafeSequenceResult.model_construct(
+    is_safe=True,
+    safe_sequence=[],
+    message="No processes in the system"
+)
 
 
 class DeadlockAnalyzer:
@@ -15,61 +42,344 @@ class DeadlockAnalyzer:
         self.nodes_dict = {node.id: node for node in graph_state.nodes}
         self.edges_list = graph_state.edges
         
-    def build_directed_graph(self) -> nx.DiGraph:
-        """Build a NetworkX directed graph from the graph state"""
-        G = nx.DiGraph()
+        # Partition nodes and edges by type once; the analysis methods reuse these
+        self._processes = [node for node in graph_state.nodes if node.type == NodeType.PROCESS]
+        self._resources = [node for node in graph_state.nodes if node.type == NodeType.RESOURCE]
+        self._process_ids = {p.id for p in self._processes}
+        self._resource_ids = {r.id for r in self._resources}
+        self._edge_by_st: Dict[Tuple[str, str], List[str]] = defaultdict(list)
+        
+        # Map process and resource IDs to contiguous integers for the flat arrays
+        self._pids = [p.id for p in self._processes]
+        self._pid2idx = {pid: i for i, pid in enumerate(self._pids)}
+        self._rids = [r.id for r in self._resources]
+        self._rid2idx = {rid: i for i, rid in enumerate(self._rids)}
+        
+        # Store edges as parallel columns. _src_idx/_tgt_idx hold process or
+        # resource indices depending on the edge type: requests go P -> R,
+        # allocations R -> P.
+        self._sources: List[str] = []
+        self._targets: List[str] = []
+        self._edge_ids: List[str] = []
+        columns = [self._register_edge(edge) for edge in self.edges_list]
+        types, instances, src_idx, tgt_idx = zip(*columns) if columns else ((), (), (), ())
+        self._types = np.array(types, dtype=np.uint8)
+        self._instances = np.array(instances, dtype=np.int64)
+        self._src_idx = np.array(src_idx, dtype=np.intp)
+        self._tgt_idx = np.array(tgt_idx, dtype=np.intp)
+        
+        # Malformed edges are left out of the wait-for graph and the dense
+        # matrices, so their presence switches the analysis to the plain RAG paths
+        self._all_edges_well_formed = not (self._types == _MALFORMED).any()
+    
+    def _is_well_formed(self, edge: Edge) -> bool:
+        """Whether an edge runs between a declared process and resource in the direction its type requires"""
+        if edge.type == EdgeType.ALLOCATION:
+            # Resource -> Process (allocation)
+            return edge.source in self._resource_ids and edge.target in self._process_ids
+        # Process -> Resource (request)
+        return edge.source in self._process_ids and edge.target in self._resource_ids
+    
+    def _register_edge(self, edge: Edge) -> Tuple[int, int, int, int]:
+        """
+        Record an edge's string columns and look up its endpoint indices.
+        Returns its (type, instances, source index, target index) columns;
+        malformed edges get the _MALFORMED type and -1 indices.
+        """
+        self._sources.append(edge.source)
+        self._targets.append(edge.target)
+        self._edge_ids.append(edge.id)
+        self._edge_by_st[(edge.source, edge.target)].append(edge.id)
+        
+        if not self._is_well_formed(edge):
+            return _MALFORMED, edge.instances, -1, -1
+        
+        code = _EDGE_TYPE_CODES[edge.type]
+        if code == _ALLOCATION:
+            return code, edge.instances, self._rid2idx[edge.source], self._pid2idx[edge.target]
+        return code, edge.instances, self._pid2idx[edge.source], self._rid2idx[edge.target]
+    
+    @cached_property
+    def cycle_info(self) -> CycleInfo:
+        """Result of cycle detection on the current state, computed on first access"""
+        return self.detect_cycle_dfs()
+    
+    @cached_property
+    def wait_for_graph(self) -> Dict[str, List[str]]:
+        """Wait-for graph of the current state, built on first access"""
+        return self.build_wait_for_graph()
+    
+    @cached_property
+    def _wait_for_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        CSR adjacency of the wait-for graph over process indices.
+        Returns (indptr, indices, via) where the processes that process u waits
+        for are indices[indptr[u]:indptr[u + 1]] and via holds the index of the
+        resource each wait goes through. Unlike build_wait_for_graph, a process
+        waiting on a resource it holds itself keeps its self-loop.
+        """
+        n_proc = len(self._pids)
+        n_res = len(self._rids)
+        
+        is_request = self._types == _REQUEST
+        is_alloc = self._types == _ALLOCATION
+        req_proc = self._src_idx[is_request]
+        req_res = self._tgt_idx[is_request]
+        alloc_res = self._src_idx[is_alloc]
+        alloc_proc = self._tgt_idx[is_alloc]
+        
+        # Group holders by resource, keeping allocation order within each group
+        order = np.argsort(alloc_res, kind='stable')
+        holders_by_res = alloc_proc[order]
+        n_holders = np.bincount(alloc_res, minlength=n_res)
+        holder_start = np.cumsum(n_holders) - n_holders
+        
+        # Pair every request (P -> R) with each holder of R
+        reps = n_holders[req_res]
+        waiters = np.repeat(req_proc, reps)
+        via = np.repeat(req_res, reps)
+        within = np.arange(len(waiters)) - np.repeat(np.cumsum(reps) - reps, reps)
+        holders = holders_by_res[np.repeat(holder_start[req_res], reps) + within]
+        
+        # Sort the (waiter, holder) pairs into CSR rows
+        order = np.argsort(waiters, kind='stable')
+        indptr = np.zeros(n_proc + 1, dtype=np.intp)
+        np.cumsum(np.bincount(waiters, minlength=n_proc), out=indptr[1:])
+        
+        return indptr, holders[order], via[order]
+    
+    @staticmethod
+    def _find_cycle(indptr: List[int], indices: List[int]) -> Optional[Tuple[List[int], List[int]]]:
+        """
+        Find one cycle with an iterative three-color DFS over a CSR adjacency.
+        White (0) nodes are unvisited, gray (1) are on the DFS stack and black (2)
+        are finished; reaching a gray node closes a cycle.
+        Returns the cycle's nodes and the CSR slots of its edges, or None.
+        """
+        n = len(indptr) - 1
+        color = [0] * n
+        parent = [-1] * n
+        parent_slot = [-1] * n
+        next_slot = indptr[:-1]
+        
+        for root in range(n):
+            if color[root]:
+                continue
+            color[root] = 1
+            stack = [root]
+            
+            while stack:
+                u = stack[-1]
+                pos = next_slot[u]
+                if pos == indptr[u + 1]:
+                    color[u] = 2
+                    stack.pop()
+                    continue
+                
+                next_slot[u] = pos + 1
+                v = indices[pos]
+                if color[v] == 0:
+                    color[v] = 1
+                    parent[v] = u
+                    parent_slot[v] = pos
+                    stack.append(v)
+                elif color[v] == 1:
+                    # Back edge u -> v: walk parents from u back to v
+                    cycle = [u]
+                    slots = [pos]
+                    w = u
+                    while w != v:
+                        slots.append(parent_slot[w])
+                        w = parent[w]
+                        cycle.append(w)
+                    cycle.reverse()
+                    slots.reverse()
+                    return cycle, slots
+        
+        return None
+    
+    @cached_property
+    def _wait_for_scc_labels(self) -> np.ndarray:
+        """Strongly connected component label of each process in the wait-for graph"""
+        indptr, indices, _ = self._wait_for_csr
+        n = len(indptr) - 1
+        graph = csr_matrix((np.ones(len(indices), dtype=np.int8), indices, indptr), shape=(n, n))
+        _, labels = connected_components(graph, directed=True, connection='strong')
+        return labels.astype(np.intp)
+    
+    def _detect_cycle_fast(self) -> CycleInfo:
+        """
+        Find a cycle in the wait-for graph and expand it back to the
+        process -> resource -> process path of the resource allocation graph.
+        Cycles only exist inside strongly connected components, so the DFS is
+        restricted to the largest non-singleton one.
+        """
+        indptr, indices, via = self._wait_for_csr
+        labels = self._wait_for_scc_labels
+        sizes = np.bincount(labels)
+        rows = np.repeat(np.arange(len(labels)), np.diff(indptr))
+        self_loops = np.flatnonzero(indices == rows)
+        
+        if len(sizes) and sizes.max() >= 2:
+            # Induced subgraph of the component; masked slots stay in row order
+            component = int(np.argmax(sizes))
+            members = np.flatnonzero(labels == component)
+            local = np.full(len(labels), -1, dtype=np.intp)
+            local[members] = np.arange(len(members))
+            sub_slots = np.flatnonzero((labels[rows] == component) & (labels[indices] == component))
+            sub_indptr = np.zeros(len(members) + 1, dtype=np.intp)
+            np.cumsum(np.bincount(local[rows[sub_slots]], minlength=len(members)), out=sub_indptr[1:])
+            sub_indices = local[indices[sub_slots]]
+            
+            # Map the cycle back to the full wait-for graph
+            cycle, slots = self._find_cycle(sub_indptr.tolist(), sub_indices.tolist())
+            found = members[cycle].tolist(), sub_slots[slots].tolist()
+        elif len(self_loops):
+            # A process waiting on a resource it holds itself
+            slot = int(self_loops[0])
+            found = [int(rows[slot])], [slot]
+        else:
+            found = None
+        
+        if found is None:
+            return _NO_CYCLE
+        
+        cycle, slots = found
+        cycle_path = []
+        affected_edges = []
+        for i, slot in enumerate(slots):
+            process = self._pids[cycle[i]]
+            holder = self._pids[cycle[(i + 1) % len(cycle)]]
+            resource = self._rids[via[slot]]
+            cycle_path += [process, resource]
+            
+            # Request edge P -> R followed by allocation edge R -> holder
+            affected_edges.extend(self._edge_by_st.get((process, resource), ()))
+            affected_edges.extend(self._edge_by_st.get((resource, holder), ()))
         
-        # Add nodes with their types
-        for node in self.graph_state.nodes:
-            G.add_node(node.id, type=node.type, label=node.label)
+        return CycleInfo.model_construct(
+            exists=True,
+            cycle_path=cycle_path + [cycle_path[0]],
+            affected_nodes=cycle_path,
+            affected_edges=affected_edges
+        )
+    
+    def _detect_cycle_rag(self) -> CycleInfo:
+        """
+        Find a cycle with a DFS over every edge of the resource allocation graph,
+        for graphs with malformed edges that the wait-for projection would drop
+        """
+        # Index declared nodes first, then endpoints that have no node
+        ids = list(self.nodes_dict)
+        id2idx = {node_id: i for i, node_id in enumerate(ids)}
+        for node_id in self._sources + self._targets:
+            if node_id not in id2idx:
+                id2idx[node_id] = len(ids)
+                ids.append(node_id)
         
-        # Add edges
-        for edge in self.graph_state.edges:
-            G.add_edge(edge.source, edge.target, 
-                      edge_type=edge.type, 
-                      edge_id=edge.id,
-                      instances=edge.instances)
+        sources = np.array([id2idx[s] for s in self._sources], dtype=np.intp)
+        targets = np.array([id2idx[t] for t in self._targets], dtype=np.intp)
+        order = np.argsort(sources, kind='stable')
+        indptr = np.zeros(len(ids) + 1, dtype=np.intp)
+        np.cumsum(np.bincount(sources, minlength=len(ids)), out=indptr[1:])
         
-        return G
+        found = self._find_cycle(indptr.tolist(), targets[order].tolist())
+        if found is None:
+            return _NO_CYCLE
+        
+        cycle = [ids[u] for u in found[0]]
+        affected_edges = []
+        for i, source in enumerate(cycle):
+            affected_edges.extend(self._edge_by_st.get((source, cycle[(i + 1) % len(cycle)]), ()))
+        
+        return CycleInfo.model_construct(
+            exists=True,
+            cycle_path=cycle + [cycle[0]],
+            affected_nodes=cycle,
+            affected_edges=affected_edges
+        )
     
     def detect_cycle_dfs(self) -> CycleInfo:
         """
         Detect cycles in the resource allocation graph using DFS
         Returns information about any detected cycles
         """
-        G = self.build_directed_graph()
+        if not self._all_edges_well_formed:
+            return self._detect_cycle_rag()
         
-        try:
-            # Find cycles using NetworkX
-            cycles = list(nx.simple_cycles(G))
-            
-            if cycles:
-                # Get the first cycle (there might be multiple)
-                cycle = cycles[0]
-                cycle_path = cycle + [cycle[0]]  # Complete the cycle
-                
-                # Find all affected edges
-                affected_edges = []
-                for i in range(len(cycle)):
-                    source = cycle[i]
-                    target = cycle[(i + 1) % len(cycle)]
-                    
-                    # Find edges between these nodes
-                    for edge in self.edges_list:
-                        if edge.source == source and edge.target == target:
-                            affected_edges.append(edge.id)
-                
-                return CycleInfo(
-                    exists=True,
-                    cycle_path=cycle_path,
-                    affected_nodes=cycle,
-                    affected_edges=affected_edges
-                )
-            else:
-                return CycleInfo(exists=False)
+        # Every cycle alternates request (P -> R) and allocation (R -> P) edges
+        is_request = self._types == _REQUEST
+        is_alloc = self._types == _ALLOCATION
+        if not is_request.any() or not is_alloc.any():
+            return _NO_CYCLE
+        
+        # ...and passes through a resource that is both requested and allocated
+        requested = self._tgt_idx[is_request]
+        allocated = self._src_idx[is_alloc]
+        if np.intersect1d(requested, allocated).size == 0:
+            return _NO_CYCLE
+        
+        return self._detect_cycle_fast()
+    
+    def would_adding_edge_create_cycle(self, source: str, target: str,
+                                       edge_type: EdgeType) -> Optional[List[str]]:
+        """
+        Check whether adding an edge_type edge source -> target closes a new
+        cycle, without rebuilding the graph. The new edge adds waits from the processes
+        requesting a resource to its holders, so this searches the existing
+        wait-for graph from the holder side of the edge to the requester side.
+        Returns the closed cycle path through the new edge, or None.
+        Cycles already present in the graph are not reported, and malformed
+        edges, whether existing or new, are not followed.
+        """
+        is_allocation = edge_type == EdgeType.ALLOCATION
+        if is_allocation:
+            # Allocation R -> P: P now holds R, so every requester of R waits on P
+            resource, process = source, target
+            r = self._rid2idx.get(resource, -1)
+            starts = [self._pid2idx[process]] if process in self._pid2idx else []
+            goals = set(self._src_idx[(self._types == _REQUEST) & (self._tgt_idx == r)].tolist())
+        else:
+            # Request P -> R: P now waits on every holder of R
+            process, resource = source, target
+            r = self._rid2idx.get(resource, -1)
+            starts = self._tgt_idx[(self._types == _ALLOCATION) & (self._src_idx == r)].tolist()
+            goals = {self._pid2idx[process]} if process in self._pid2idx else set()
+        
+        indptr, indices, via = self._wait_for_csr
+        indptr = indptr.tolist()
+        indices = indices.tolist()
+        
+        # BFS over the wait-for graph, remembering how each process was reached
+        parent = {}
+        queue = []
+        for u in starts:
+            if u not in parent:
+                parent[u] = None
+                queue.append(u)
+        
+        for u in queue:
+            if u in goals:
+                path = []
+                while parent[u] is not None:
+                    prev, slot = parent[u]
+                    path += [self._pids[u], self._rids[via[slot]]]
+                    u = prev
+                path.append(self._pids[u])
+                path.reverse()
                 
-        except Exception as e:
-            return CycleInfo(exists=False)
+                # Close the cycle through the new edge
+                if is_allocation:
+                    return path + [resource, path[0]]
+                return [process, resource] + path
+            
+            for slot in range(indptr[u], indptr[u + 1]):
+                v = indices[slot]
+                if v not in parent:
+                    parent[v] = (u, slot)
+                    queue.append(v)
+        
+        return None
     
     def build_wait_for_graph(self) -> Dict[str, List[str]]:
         """
@@ -78,32 +388,14 @@ class DeadlockAnalyzer:
         - P1 is waiting for a resource
         - That resource is allocated to P2
         """
-        wait_for = {node.id: [] for node in self.graph_state.nodes if node.type == NodeType.PROCESS}
-        
-        # Find what each process is waiting for
-        process_requests = {}  # process -> list of resources it's requesting
-        resource_allocations = {}  # resource -> list of processes it's allocated to
+        indptr, indices, _ = self._wait_for_csr
+        indptr = indptr.tolist()
+        indices = indices.tolist()
         
-        for edge in self.edges_list:
-            if edge.type == EdgeType.REQUEST:
-                # Process -> Resource (request)
-                if edge.source not in process_requests:
-                    process_requests[edge.source] = []
-                process_requests[edge.source].append(edge.target)
-            elif edge.type == EdgeType.ALLOCATION:
-                # Resource -> Process (allocation)
-                if edge.source not in resource_allocations:
-                    resource_allocations[edge.source] = []
-                resource_allocations[edge.source].append(edge.target)
-        
-        # Build wait-for relationships
-        for process, requested_resources in process_requests.items():
-            for resource in requested_resources:
-                # Find which processes have this resource allocated
-                if resource in resource_allocations:
-                    for holder_process in resource_allocations[resource]:
-                        if holder_process != process:
-                            wait_for[process].append(holder_process)
+        wait_for = {}
+        for p in self._processes:
+            u = self._pid2idx[p.id]
+            wait_for[p.id] = [self._pids[v] for v in indices[indptr[u]:indptr[u + 1]] if v != u]
         
         return wait_for
     
@@ -112,15 +404,25 @@ class DeadlockAnalyzer:
         Perform complete deadlock analysis on the graph
         Returns comprehensive analysis result
         """
-        cycle_info = self.detect_cycle_dfs()
-        wait_for_graph = self.build_wait_for_graph()
+        cycle_info = self.cycle_info
+        wait_for_graph = self.wait_for_graph
+        
+        # With multi-instance resources a cycle is necessary but not sufficient
+        # for deadlock, so let the Banker check decide
+        if cycle_info.exists and any(
+            self.nodes_dict[node_id].instances > 1
+            for node_id in cycle_info.affected_nodes
+            if node_id in self._resource_ids
+        ):
+            if self.calculate_safe_sequence().is_safe:
+                cycle_info = _NO_CYCLE
         
         if cycle_info.exists:
             message = f"⚠️ Deadlock detected! Cycle involves: {' → '.join(cycle_info.cycle_path)}"
         else:
             message = "✓ No deadlock detected. System is in a safe state."
         
-        return DeadlockAnalysisResult(
+        return DeadlockAnalysisResult.model_construct(
             has_deadlock=cycle_info.exists,
             cycle_info=cycle_info if cycle_info.exists else None,
             wait_for_graph=wait_for_graph,
@@ -128,93 +430,155 @@ class DeadlockAnalyzer:
             timestamp=datetime.now().isoformat()
         )
     
-    def calculate_safe_sequence(self) -> SafeSequenceResult:
+    def _banker_matrices(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
-        Calculate safe sequence using Banker's Algorithm approach
-        This is a simplified version that works with the RAG model
+        Dense Banker's inputs over the process and resource indices:
+        alloc[p, r], req[p, r] and avail[r]
         """
-        processes = [node for node in self.graph_state.nodes if node.type == NodeType.PROCESS]
-        resources = [node for node in self.graph_state.nodes if node.type == NodeType.RESOURCE]
+        n_proc = len(self._pids)
+        n_res = len(self._rids)
+        alloc = np.zeros((n_proc, n_res), dtype=np.int64)
+        req = np.zeros((n_proc, n_res), dtype=np.int64)
+        avail = np.array([r.available for r in self._resources], dtype=np.int64)
         
-        if not processes:
-            return SafeSequenceResult(
-                is_safe=True,
-                safe_sequence=[],
-                message="No processes in the system"
-            )
+        is_alloc = self._types == _ALLOCATION
+        alloc[self._tgt_idx[is_alloc], self._src_idx[is_alloc]] = self._instances[is_alloc]
+        is_request = self._types == _REQUEST
+        req[self._src_idx[is_request], self._tgt_idx[is_request]] = self._instances[is_request]
         
-        # Track available resources
-        available = {r.id: r.available for r in resources}
-        
-        # Track allocations and requests for each process
-        allocations = {p.id: {} for p in processes}
-        requests = {p.id: {} for p in processes}
+        return alloc, req, avail
+    
+    def _safe_sequence_scalar(self) -> Tuple[bool, List[str]]:
+        """
+        Banker's check over per-process dicts keyed by the edge endpoints as given,
+        for small graphs and graphs whose edges do not all fit the dense matrices.
+        Returns whether the state is safe and the process IDs in completion order.
+        """
+        work = {r.id: r.available for r in self._resources}
+        allocations = {p.id: {} for p in self._processes}
+        requests = {p.id: {} for p in self._processes}
         
         for edge in self.edges_list:
             if edge.type == EdgeType.ALLOCATION:
                 # Resource -> Process
-                process_id = edge.target
-                resource_id = edge.source
-                if process_id in allocations:
-                    allocations[process_id][resource_id] = edge.instances
-            elif edge.type == EdgeType.REQUEST:
+                if edge.target in allocations:
+                    allocations[edge.target][edge.source] = edge.instances
+            elif edge.source in requests:
                 # Process -> Resource
-                process_id = edge.source
-                resource_id = edge.target
-                if process_id in requests:
-                    requests[process_id][resource_id] = edge.instances
+                requests[edge.source][edge.target] = edge.instances
         
-        # Try to find a safe sequence
         safe_sequence = []
         finished = set()
-        work = available.copy()
-        
-        while len(finished) < len(processes):
-            found_process = False
-            
-            for process in processes:
+        while len(finished) < len(self._processes):
+            for process in self._processes:
                 if process.id in finished:
                     continue
                 
                 # Check if this process can finish with available resources
-                can_finish = True
-                for resource_id, needed in requests[process.id].items():
-                    if work.get(resource_id, 0) < needed:
-                        can_finish = False
-                        break
-                
-                if can_finish:
+                if all(work.get(r, 0) >= needed for r, needed in requests[process.id].items()):
                     # Process can finish, release its resources
-                    for resource_id, allocated in allocations[process.id].items():
-                        work[resource_id] = work.get(resource_id, 0) + allocated
-                    
+                    for r, allocated in allocations[process.id].items():
+                        work[r] = work.get(r, 0) + allocated
                     safe_sequence.append(process.id)
                     finished.add(process.id)
-                    found_process = True
                     break
-            
-            if not found_process:
-                # No process can proceed - unsafe state
-                return SafeSequenceResult(
-                    is_safe=False,
-                    safe_sequence=[],
-                    message=f"⚠️ System is in an unsafe state. Cannot find safe sequence. Completed: {safe_sequence}"
-                )
-        
-        return SafeSequenceResult(
+            else:
+                return False, safe_sequence
+        
+        return True, safe_sequence
+    
+    def calculate_safe_sequence(self) -> SafeSequenceResult:
+        """
+        Calculate safe sequence using Banker's Algorithm approach
+        This is a simplified version that works with the RAG model
+        """
+        if not self._processes:
+            return _NO_PROCESSES
+        
+        if self._all_edges_well_formed and len(self._pids) * len(self._rids) > _SCALAR_BANKER_MAX_CELLS:
+            is_safe, order = banker_safe_sequence(*self._banker_matrices())
+            safe_sequence = [self._pids[p] for p in order]
+        else:
+            is_safe, safe_sequence = self._safe_sequence_scalar()
+        
+        if not is_safe:
+            return SafeSequenceResult.model_construct(
+                is_safe=False,
+                safe_sequence=[],
+                message=f"⚠️ System is in an unsafe state. Cannot find safe sequence. Completed: {safe_sequence}"
+            )
+        
+        return SafeSequenceResult.model_construct(
             is_safe=True,
             safe_sequence=safe_sequence,
             message=f"✓ Safe sequence found: {' → '.join(safe_sequence)}"
         )
 
 
+class _HashedGraphState:
+    """Graph state keyed by a digest of its JSON form, for use as a cache key"""
+    __slots__ = ('graph_state', 'digest')
+    
+    def __init__(self, graph_state: GraphState):
+        self.graph_state = graph_state
+        self.digest = hashlib.blake2b(graph_state.model_dump_json().encode(), digest_size=16).digest()
+    
+    def __hash__(self) -> int:
+        return hash(self.digest)
+    
+    def __eq__(self, other) -> bool:
+        return isinstance(other, _HashedGraphState) and self.digest == other.digest
+
+
+@lru_cache(maxsize=128)
+def _cached_analyzer(state: _HashedGraphState) -> DeadlockAnalyzer:
+    return DeadlockAnalyzer(state.graph_state)
+
+
+@lru_cache(maxsize=128)
+def _analyze_cached(state: _HashedGraphState) -> DeadlockAnalysisResult:
+    return _cached_analyzer(state).analyze_deadlock()
+
+
+@lru_cache(maxsize=128)
+def _safe_sequence_cached(state: _HashedGraphState) -> SafeSequenceResult:
+    return _cached_analyzer(state).calculate_safe_sequence()
+
+
+def get_analyzer(graph_state: GraphState) -> DeadlockAnalyzer:
+    """
+    Shared analyzer for a graph state, reused across requests with identical state.
+    The returned analyzer is shared and must not be mutated.
+    """
+    return _cached_analyzer(_HashedGraphState(graph_state))
+
+
 def analyze_graph_for_deadlock(graph_state: GraphState) -> DeadlockAnalysisResult:
-    """Helper function to analyze a graph for deadlocks"""
-    analyzer = DeadlockAnalyzer(graph_state)
-    return analyzer.analyze_deadlock()
+    """
+    Helper function to analyze a graph for deadlocks.
+    The analysis is cached per graph state; each call gets a copy stamped with
+    its own timestamp, whose lists and dicts are shared and must not be mutated.
+    """
+    result = _analyze_cached(_HashedGraphState(graph_state))
+    return result.model_copy(update={"timestamp": datetime.now().isoformat()})
+
+
+def would_cause_deadlock(graph_state: GraphState, new_edge: Edge) -> bool:
+    """Helper function to check whether adding an edge would deadlock the graph"""
+    analyzer = get_analyzer(graph_state)
+    if analyzer._all_edges_well_formed and analyzer._is_well_formed(new_edge) and \
+            not analyzer.cycle_info.exists and \
+            analyzer.would_adding_edge_create_cycle(new_edge.source, new_edge.target, new_edge.type) is None:
+        return False
+    
+    # Only a possible cycle needs the full analysis of the new state
+    new_state = GraphState(nodes=graph_state.nodes, edges=graph_state.edges + [new_edge])
+    return DeadlockAnalyzer(new_state).analyze_deadlock().has_deadlock
 
 
 def calculate_safe_sequence(graph_state: GraphState) -> SafeSequenceResult:
-    """Helper function to calculate safe sequence"""
-    analyzer = DeadlockAnalyzer(graph_state)
-    return analyzer.calculate_safe_sequence()
+    """
+    Helper function to calculate safe sequence.
+    Results are cached per graph state and shared, so they must not be mutated.
+    """
+    return _safe_sequence_cached(_HashedGraphState(graph_state))
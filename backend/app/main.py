@@ -1,18 +1,29 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Dict
+import orjson
 import uvicorn
 
 from .graph_models import (
     GraphState, DeadlockAnalysisResult, SafeSequenceResult,
     AllocationRequest, SimulationResult, Node, Edge, EdgeType
 )
-from .deadlock_analyzer import analyze_graph_for_deadlock, calculate_safe_sequence
+from .deadlock_analyzer import analyze_graph_for_deadlock, calculate_safe_sequence, would_cause_deadlock
+from .banker_kernel import warm_up as warm_up_banker_kernel
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Compile the Banker's kernel before serving requests"""
+    warm_up_banker_kernel()
+    yield
+
 
 app = FastAPI(
     title="Resource Allocation & Deadlock Analyzer API",
     description="API for analyzing resource allocation graphs and detecting deadlocks",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Enable CORS for frontend
@@ -79,17 +90,46 @@ async def get_safe_sequence(graph_state: GraphState):
         raise HTTPException(status_code=500, detail=f"Error calculating safe sequence: {str(e)}")
 
 
-@app.post("/api/simulate-allocation", response_model=SimulationResult)
-async def simulate_allocation(request: Dict):
+# The simulate route reads its body itself, so document the expected payload
+SIMULATE_REQUEST_SCHEMA = {
+    "title": "SimulationRequest",
+    "type": "object",
+    "properties": {
+        "graph_state": {"$ref": "#/components/schemas/GraphState"},
+        "allocation_request": AllocationRequest.model_json_schema()
+    }
+}
+
+
+@app.post(
+    "/api/simulate-allocation",
+    response_model=SimulationResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": SIMULATE_REQUEST_SCHEMA}}
+        }
+    }
+)
+async def simulate_allocation(request: Request):
     """
     Simulate a resource allocation and check if it would cause deadlock.
     
     Takes a current graph state and a proposed allocation, returns whether
     the allocation is safe to perform.
     """
+    # Parse the raw body once; malformed bodies are client errors
+    try:
+        payload = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid JSON body: {str(e)}")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=422, detail="Request body must be a JSON object")
+    
     try:
-        graph_state = GraphState(**request.get("graph_state", {}))
-        allocation_request = AllocationRequest(**request.get("allocation_request", {}))
+        # Validate each part a single time
+        graph_state = GraphState.model_validate(payload.get("graph_state", {}))
+        allocation_request = AllocationRequest.model_validate(payload.get("allocation_request", {}))
         
         # Create a new edge for the proposed allocation
         new_edge = Edge(
@@ -100,16 +140,8 @@ async def simulate_allocation(request: Dict):
             instances=allocation_request.instances
         )
         
-        # Create new graph state with the proposed allocation
-        new_state = GraphState(
-            nodes=graph_state.nodes.copy(),
-            edges=graph_state.edges + [new_edge]
-        )
-        
-        # Analyze for deadlock
-        analysis = analyze_graph_for_deadlock(new_state)
-        
-        if analysis.has_deadlock:
+        # Check whether the proposed allocation closes a cycle
+        if would_cause_deadlock(graph_state, new_edge):
             return SimulationResult(
                 success=False,
                 message="⚠️ This allocation would cause a deadlock!",
@@ -117,6 +149,11 @@ async def simulate_allocation(request: Dict):
                 would_cause_deadlock=True
             )
         else:
+            # Create new graph state with the proposed allocation
+            new_state = GraphState(
+                nodes=graph_state.nodes.copy(),
+                edges=graph_state.edges + [new_edge]
+            )
             return SimulationResult(
                 success=True,
                 message="✓ Allocation is safe and will not cause deadlock",